@@ -1,13 +1,177 @@
 import os
 import ast
-from typing import Dict, List, Set, Optional
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Set, Optional, Tuple
 import logging
 
+# Имя файла кэша результатов анализа в корне проекта
+CACHE_FILENAME = '.codegraph_cache.json'
+# Версия формата кэша; при изменении формата старый кэш игнорируется
+_CACHE_VERSION = 2
+# Поля результата разбора, которые должны быть в каждой записи кэша
+_CACHE_RESULT_KEYS = ('imported_names', 'functions', 'classes')
+
+# Директории, которые по умолчанию не сканируются (служебные файлы, окружения, сборки)
+DEFAULT_IGNORE_DIRS = frozenset({
+    '.git', '__pycache__', 'node_modules', '.venv', 'venv', '.tox',
+    'dist', 'build', '.mypy_cache', '.pytest_cache'
+})
+
+# Минимальное число файлов для параллельного разбора; на меньших проектах
+# запуск процессов обходится дороже самого анализа
+_PARALLEL_MIN_FILES = 50
+
+
+def _get_function_args(node: ast.FunctionDef) -> List[str]:
+    """
+    Получение аргументов функции
+
+    Args:
+        node: Узел AST функции
+
+    Returns:
+        List[str]: Список аргументов функции
+    """
+    return [arg.arg for arg in node.args.args]
+
+
+class _FileVisitor(ast.NodeVisitor):
+    """
+    Сбор импортов, функций и классов Python файла за один итеративный обход AST.
+    
+    Обход идет в ширину (в том же порядке, что и ast.walk) без рекурсии, а обработчик
+    узла ищется в __dict__ класса вместо getattr. Методы visit_* не должны вызывать
+    generic_visit: дочерние узлы обходятся в любом случае.
+    """
+
+    def __init__(self):
+        self.imported_names: Dict[str, Set[str]] = {}  # Модуль верхнего уровня -> импортированные классы/функции
+        self.functions: List[Dict] = []
+        self.classes: List[Dict] = []
+        self._methods_ids: Set[int] = set()  # id узлов-методов, чтобы не считать их функциями
+
+    def visit(self, node: ast.AST) -> None:
+        self.generic_visit(node)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        visitors = type(self).__dict__
+        dispatch = {}  # Тип узла -> обработчик (или None)
+        AST = ast.AST
+        todo = deque([node])
+        pop = todo.popleft
+        push = todo.append
+        while todo:
+            node = pop()
+            node_type = type(node)
+            try:
+                visitor = dispatch[node_type]
+            except KeyError:
+                visitor = dispatch[node_type] = visitors.get('visit_' + node_type.__name__)
+            if visitor is not None:
+                visitor(self, node)
+            # Дочерние узлы собираем напрямую по _fields, без ast.iter_child_nodes
+            for field in node._fields:
+                value = getattr(node, field, None)
+                if isinstance(value, AST):
+                    push(value)
+                elif isinstance(value, list):
+                    for item in value:
+                        if isinstance(item, AST):
+                            push(item)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for name in node.names:
+            module_name = name.name.partition('.')[0]
+            self.imported_names.setdefault(module_name, set()).add(name.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.module:
+            module_name = node.module.partition('.')[0]
+            # Добавляем информацию о конкретных импортированных элементах
+            module_names = self.imported_names.setdefault(module_name, set())
+            for name in node.names:
+                module_names.add(f"{module_name}.{name.name}")
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        if id(node) not in self._methods_ids:
+            self.functions.append({
+                'name': node.name,
+                'lineno': node.lineno,
+                'args': _get_function_args(node)
+            })
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        # Методы берем напрямую из тела класса, без повторного обхода
+        methods = []
+        for item in node.body:
+            if isinstance(item, ast.FunctionDef):
+                self._methods_ids.add(id(item))
+                methods.append({
+                    'name': item.name,
+                    'args': _get_function_args(item)
+                })
+        self.classes.append({
+            'name': node.name,
+            'methods': methods
+        })
+
+
+def _extract_python_info(tree: ast.AST) -> Dict:
+    """
+    Извлечение импортов, функций и классов из AST (без фильтрации внешних импортов)
+
+    Args:
+        tree: AST дерево Python файла
+
+    Returns:
+        Dict: Импортированные имена, сгруппированные по модулю верхнего уровня
+        (ключи - импортируемые модули), функции и классы файла
+    """
+    visitor = _FileVisitor()
+    visitor.visit(tree)
+    return {
+        'imported_names': {module: sorted(names) for module, names in visitor.imported_names.items()},
+        'functions': visitor.functions,
+        'classes': visitor.classes
+    }
+
+
+def _analyze_python_file_worker(file_path: str, relative_path: str) -> Tuple[str, Optional[Dict], Optional[str]]:
+    """
+    Разбор Python файла; выполняется в отдельном процессе при параллельном анализе
+    
+    Args:
+        file_path: Путь к файлу
+        relative_path: Относительный путь к файлу
+    
+    Returns:
+        Tuple[str, Optional[Dict], Optional[str]]: Относительный путь, результат разбора
+        (см. _extract_python_info) и текст ошибки (если разбор не удался)
+    """
+    try:
+        # compile принимает байты напрямую (с учетом BOM и coding-комментария),
+        # поэтому декодировать исходник в str заранее не нужно
+        with open(file_path, 'rb') as file:
+            source = file.read()
+        # compile с PyCF_ONLY_AST - то же, что ast.parse, но без наследования
+        # __future__-флагов вызывающего модуля
+        tree = compile(source, file_path, 'exec', flags=ast.PyCF_ONLY_AST,
+                       dont_inherit=True, optimize=2)
+        return relative_path, _extract_python_info(tree), None
+    except Exception as e:
+        return relative_path, None, str(e)
+
+
 class ProjectAnalyzer:
     def __init__(self, 
                  project_path: Optional[str] = None,
                  file_extensions: Optional[List[str]] = None,
-                 include_external: bool = False):
+                 include_external: bool = False,
+                 use_cache: bool = True,
+                 ignore_dirs: Optional[Iterable[str]] = None):
         """
         Инициализация анализатора проекта
         
@@ -15,11 +179,22 @@ class ProjectAnalyzer:
             project_path: Путь к проекту для анализа. Если None, используется текущая директория
             file_extensions: Список расширений файлов для анализа
             include_external: Включать ли внешние зависимости
+            use_cache: Использовать ли кэш результатов анализа между запусками
+            ignore_dirs: Имена директорий, которые не нужно сканировать.
+                Если None, используется DEFAULT_IGNORE_DIRS
         """
         self.project_path = project_path or os.getcwd()
         self.file_extensions = file_extensions or ['.py', '.js', '.html', '.css']
+        self._ext_tuple = tuple(self.file_extensions)  # Для str.endswith без генератора
         self.include_external = include_external
+        self.ignore_dirs = DEFAULT_IGNORE_DIRS if ignore_dirs is None else frozenset(ignore_dirs)
         self.dependencies = {}  # Словарь зависимостей
+        self._local_modules: Set[str] = set()  # Имена локальных модулей и пакетов проекта
+        self.use_cache = use_cache
+        self._cache_path = os.path.join(self.project_path, CACHE_FILENAME)
+        self._cache: Dict[str, Dict] = {}  # Кэш предыдущего запуска: путь -> {mtime, size, result}
+        self._new_cache: Dict[str, Dict] = {}  # Кэш текущего запуска
+        self._python_files: List[Tuple] = []  # Найденные Python файлы: (путь, отн. путь, stat, запись кэша или None)
         self.logger = logging.getLogger(__name__)
 
     def analyze(self) -> Dict:
@@ -27,156 +202,236 @@ class ProjectAnalyzer:
         Анализ проекта и построение графа зависимостей
         
         Returns:
-            Dict: Словарь зависимостей между модулями
+            Dict: Словарь зависимостей между модулями. Поля imports и imported_names
+            хранятся как множества; для сериализации в JSON используйте to_json()
         """
         self.dependencies = {}
+        self._local_modules = set()
+        self._cache = self._load_cache() if self.use_cache else {}
+        self._new_cache = {}
+        self._python_files = []
         self._scan_directory(self.project_path)
+        # Фильтрация внешних импортов возможна только после полного обхода,
+        # когда известны все локальные модули
+        self._process_python_files()
+        if self.use_cache:
+            self._save_cache()
         return self.dependencies
 
+    def to_json(self) -> Dict:
+        """
+        Представление зависимостей, пригодное для сериализации в JSON
+        
+        Returns:
+            Dict: Словарь зависимостей с отсортированными списками вместо множеств
+        """
+        return {
+            path: {
+                **data,
+                'imports': sorted(data['imports']),
+                'imported_names': sorted(data['imported_names'])
+            }
+            for path, data in self.dependencies.items()
+        }
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        """
+        Загрузка кэша результатов анализа с диска
+        
+        Returns:
+            Dict[str, Dict]: Записи кэша по относительным путям файлов
+        """
+        try:
+            with open(self._cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == _CACHE_VERSION:
+                files = data.get('files')
+                if isinstance(files, dict):
+                    return files
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.warning(f"Не удалось загрузить кэш {self._cache_path}: {str(e)}")
+        return {}
+
+    def _save_cache(self) -> None:
+        """Атомарная запись кэша результатов анализа на диск"""
+        tmp_path = f"{self._cache_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': _CACHE_VERSION, 'files': self._new_cache}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._cache_path)
+        except Exception as e:
+            self.logger.warning(f"Не удалось сохранить кэш {self._cache_path}: {str(e)}")
+
     def _scan_directory(self, directory: str) -> None:
         """
-        Рекурсивное сканирование директории
+        Рекурсивное сканирование директории через os.scandir (без лишних stat на каждый файл).
+        Попутно собираются имена локальных модулей проекта: все *.py модули (без расширения)
+        и пакеты с __init__.py
         
         Args:
             directory: Путь к директории для сканирования
         """
-        try:
-            for root, _, files in os.walk(directory):
-                for file in files:
-                    if any(file.endswith(ext) for ext in self.file_extensions):
-                        file_path = os.path.join(root, file)
-                        relative_path = os.path.relpath(file_path, self.project_path)
-                        self._analyze_file(file_path, relative_path)
-        except Exception as e:
-            self.logger.error(f"Ошибка при сканировании директории {directory}: {str(e)}")
+        rel_root = os.path.relpath(directory, self.project_path)
+        stack = [(directory, '' if rel_root == os.curdir else rel_root)]
+        while stack:
+            current, rel_dir = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        name = entry.name
+                        relative_path = os.path.join(rel_dir, name)
+                        if entry.is_dir(follow_symlinks=False):
+                            # Игнорируемые директории отсекаются целиком, не заходя внутрь
+                            if name not in self.ignore_dirs:
+                                stack.append((entry.path, relative_path))
+                            continue
+                        if name.endswith('.py'):
+                            self._local_modules.add(name[:-3])
+                            if name == '__init__.py' and rel_dir:
+                                self._local_modules.add(os.path.basename(rel_dir))
+                        if name.endswith(self._ext_tuple):
+                            self._analyze_file(entry.path, relative_path, entry)
+            except OSError as e:
+                self.logger.error(f"Ошибка при сканировании директории {current}: {str(e)}")
 
-    def _analyze_file(self, file_path: str, relative_path: str) -> None:
+    def _analyze_file(self, file_path: str, relative_path: str,
+                      dir_entry: Optional[os.DirEntry] = None) -> None:
         """
         Анализ отдельного файла
         
         Args:
             file_path: Абсолютный путь к файлу
             relative_path: Относительный путь к файлу
+            dir_entry: Запись os.scandir для файла, если она есть
         """
         try:
             if file_path.endswith('.py'):
-                self._analyze_python_file(file_path, relative_path)
+                self._queue_python_file(file_path, relative_path, dir_entry)
             # TODO: Добавить анализ для других типов файлов (js, html, css)
         except Exception as e:
             self.logger.error(f"Ошибка при анализе файла {file_path}: {str(e)}")
 
-    def _analyze_python_file(self, file_path: str, relative_path: str) -> None:
+    def _queue_python_file(self, file_path: str, relative_path: str,
+                           dir_entry: Optional[os.DirEntry] = None) -> None:
         """
-        Анализ Python файла
+        Постановка Python файла в очередь на разбор с проверкой кэша.
+        Сам разбор выполняется позже в _process_python_files
         
         Args:
             file_path: Путь к файлу
             relative_path: Относительный путь к файлу
+            dir_entry: Запись os.scandir для файла, если она есть
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                tree = ast.parse(file.read(), filename=file_path)
-                
-            imports = set()
-            imported_names = set()  # Для хранения импортированных классов/функций
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for name in node.names:
-                        module_name = name.name.split('.')[0]
-                        imports.add(module_name)
-                        imported_names.add(name.name)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        module_name = node.module.split('.')[0]
-                        imports.add(module_name)
-                        # Добавляем информацию о конкретных импортированных элементах
-                        for name in node.names:
-                            imported_names.add(f"{module_name}.{name.name}")
-
-            # Фильтрация внешних зависимостей
-            if not self.include_external:
-                local_imports = set()
-                local_names = set()
-                for imp in imports:
-                    possible_paths = [
-                        os.path.join(self.project_path, f"{imp}.py"),
-                        os.path.join(self.project_path, imp, "__init__.py"),
-                        os.path.join(os.path.dirname(file_path), f"{imp}.py"),
-                    ]
-                    if any(os.path.exists(p) for p in possible_paths):
-                        local_imports.add(imp)
-                        # Сохраняем импортированные имена только для локальных модулей
-                        local_names.update(name for name in imported_names if name.split('.')[0] == imp)
-                imports = local_imports
-                imported_names = local_names
-
-            self.dependencies[relative_path] = {
-                'imports': list(imports),
-                'imported_names': list(imported_names),  # Добавляем новое поле
-                'functions': self._get_functions(tree),
-                'classes': self._get_classes(tree)
-            }
+            # Единственный stat на файл: он же станет ключом новой записи кэша.
+            # Если файл изменится до чтения, ключ окажется старше содержимого,
+            # и при следующем запуске файл просто будет разобран заново
+            st = dir_entry.stat() if dir_entry is not None else os.stat(file_path)
+            cached = self._cache.get(relative_path)
+            if not self._is_cache_entry_valid(cached, st):
+                # Файл изменился с прошлого запуска или запись кэша повреждена - разбираем заново
+                cached = None
+            self._python_files.append((file_path, relative_path, st, cached))
         except Exception as e:
-            self.logger.error(f"Ошибка при анализе Python файла {file_path}: {str(e)}")
+            self.logger.error(f"Ошибка при чтении Python файла {file_path}: {str(e)}")
 
-    def _get_functions(self, tree: ast.AST) -> List[Dict]:
+    def _is_cache_entry_valid(self, cached, st: os.stat_result) -> bool:
         """
-        Получение списка функций из AST
+        Проверка, что запись кэша имеет ожидаемый формат и соответствует текущему файлу
         
         Args:
-            tree: AST дерево Python файла
+            cached: Запись кэша для файла (или None)
+            st: Результат stat для файла
         
         Returns:
-            List[Dict]: Список функций с их характеристиками
-        """
-        functions = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                functions.append({
-                    'name': node.name,
-                    'lineno': node.lineno,
-                    'args': [arg.arg for arg in node.args.args]
-                })
-        return functions
+            bool: True если запись можно использовать вместо разбора файла
+        """
+        if not isinstance(cached, dict):
+            return False
+        result = cached.get('result')
+        return (cached.get('mtime') == st.st_mtime_ns
+                and cached.get('size') == st.st_size
+                and isinstance(result, dict)
+                and all(key in result for key in _CACHE_RESULT_KEYS))
+
+    def _process_python_files(self) -> None:
+        """Разбор найденных Python файлов, которых нет в кэше, и заполнение зависимостей"""
+        to_parse = [(file_path, relative_path)
+                    for file_path, relative_path, _, cached in self._python_files if cached is None]
+        parsed = {}
+        for relative_path, info, error in self._parse_python_files(to_parse):
+            if error is not None:
+                self.logger.error(f"Ошибка при анализе Python файла {relative_path}: {error}")
+            else:
+                parsed[relative_path] = info
+
+        # Заполняем зависимости в порядке обхода директорий
+        for _, relative_path, st, cached in self._python_files:
+            if cached is None:
+                info = parsed.get(relative_path)
+                if info is None:
+                    continue
+                cached = {
+                    'mtime': st.st_mtime_ns,
+                    'size': st.st_size,
+                    'result': info
+                }
+            self._new_cache[relative_path] = cached
+            self._add_python_dependencies(relative_path, cached['result'])
 
-    def _get_classes(self, tree: ast.AST) -> List[Dict]:
+    def _parse_python_files(self, files: List[Tuple[str, str]]) -> List[Tuple[str, Optional[Dict], Optional[str]]]:
         """
-        Получение информации о классах из AST
+        Разбор Python файлов; на больших проектах - параллельно в нескольких процессах
         
         Args:
-            tree: AST дерево
-            
+            files: Список пар (путь к файлу, относительный путь)
+        
         Returns:
-            Список словарей с информацией о классах
-        """
-        classes = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                methods = []
-                for item in node.body:
-                    if isinstance(item, ast.FunctionDef):
-                        methods.append({
-                            'name': item.name,
-                            'args': self._get_function_args(item)
-                        })
-                classes.append({
-                    'name': node.name,
-                    'methods': methods
-                })
-        return classes
+            List[Tuple[str, Optional[Dict], Optional[str]]]: Результаты _analyze_python_file_worker
+        """
+        workers = os.cpu_count() or 1
+        # При одном процессоре или малом числе файлов пул процессов дает только накладные расходы
+        if workers < 2 or len(files) < _PARALLEL_MIN_FILES:
+            return [_analyze_python_file_worker(*f) for f in files]
 
-    def _get_function_args(self, node: ast.FunctionDef) -> List[str]:
+        file_paths = [f[0] for f in files]
+        relative_paths = [f[1] for f in files]
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(
+                    _analyze_python_file_worker, file_paths, relative_paths,
+                    chunksize=max(1, len(files) // (workers * 4))
+                ))
+        except (OSError, BrokenProcessPool) as e:
+            self.logger.warning(f"Параллельный анализ недоступен, файлы будут разобраны последовательно: {str(e)}")
+            return [_analyze_python_file_worker(*f) for f in files]
+
+    def _add_python_dependencies(self, relative_path: str, info: Dict) -> None:
         """
-        Получение аргументов функции
+        Добавление результата разбора Python файла в словарь зависимостей
         
         Args:
-            node: Узел AST функции
-        
-        Returns:
-            List[str]: Список аргументов функции
+            relative_path: Относительный путь к файлу
+            info: Результат разбора файла (см. _extract_python_info)
         """
-        return [arg.arg for arg in node.args.args]
+        names_by_module = info['imported_names']
+
+        # Фильтрация внешних зависимостей
+        if self.include_external:
+            imports = set(names_by_module)
+        else:
+            imports = names_by_module.keys() & self._local_modules
+        # Сохраняем импортированные имена только для оставшихся модулей
+        imported_names = {name for imp in imports for name in names_by_module[imp]}
+
+        self.dependencies[relative_path] = {
+            'imports': imports,
+            'imported_names': imported_names,
+            'functions': info['functions'],
+            'classes': info['classes']
+        }
 
     def _is_local_import(self, import_name: str) -> bool:
         """
@@ -188,9 +443,5 @@ class ProjectAnalyzer:
         Returns:
             bool: True если импорт локальный, False если внешний
         """
-        # Проверяем наличие файла с таким именем в проекте
-        possible_paths = [
-            os.path.join(self.project_path, *import_name.split('.')),
-            os.path.join(self.project_path, *import_name.split('.')) + '.py'
-        ]
-        return any(os.path.exists(path) for path in possible_paths)
+        # Проверяем наличие модуля с таким именем среди собранных при анализе
+        return import_name.partition('.')[0] in self._local_modules
@@ -27,6 +27,11 @@ def main():
                        help='Включить внешние зависимости')
     parser.add_argument('--extensions', type=str, default='.py,.js,.html,.css',
                        help='Расширения файлов для анализа (через запятую)')
+    parser.add_argument('--ignore-dirs', type=str, default=None,
+                       help='Директории, которые не нужно сканировать (через запятую); '
+                            'по умолчанию .git, __pycache__, node_modules, venv и т.п.')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Не использовать кэш результатов анализа')
     
     args = parser.parse_args()
     
@@ -36,12 +41,15 @@ def main():
     
     # Конвертируем строку с расширениями в список
     extensions = args.extensions.split(',')
+    ignore_dirs = args.ignore_dirs.split(',') if args.ignore_dirs is not None else None
     
     # Создаем анализатор
     analyzer = ProjectAnalyzer(
         project_path=project_path,
         file_extensions=extensions,
-        include_external=args.include_external
+        include_external=args.include_external,
+        use_cache=not args.no_cache,
+        ignore_dirs=ignore_dirs
     )
     
     # Запускаем анализ
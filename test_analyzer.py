@@ -1,15 +1,24 @@
 from analyzer import ProjectAnalyzer
 import json
 
+try:
+    import orjson  # Необязательная зависимость: быстрее json на больших проектах
+except ImportError:
+    orjson = None
+
 def main():
     # Создаем экземпляр анализатора
     analyzer = ProjectAnalyzer(include_external=False)
     
     # Запускаем анализ
-    dependencies = analyzer.analyze()
+    analyzer.analyze()
     
     # Выводим результаты в консоль
-    print(json.dumps(dependencies, indent=2, ensure_ascii=False))
+    result = analyzer.to_json()
+    if orjson is not None:
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8'))
+    else:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
 
 if __name__ == "__main__":
     main()
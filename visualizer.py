@@ -1,9 +1,46 @@
-from pyvis.network import Network
-import networkx as nx
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import os
 import json
 
+try:
+    import orjson  # Необязательная зависимость: заметно быстрее json на больших графах
+except ImportError:
+    orjson = None
+
+# vis-network той же версии, что использовал pyvis
+_VIS_JS_URL = "https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js"
+_VIS_CSS_URL = "https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/dist/vis-network.min.css"
+# Хэши Subresource Integrity для файлов выше (взяты из шаблона pyvis 0.3.2)
+_VIS_JS_INTEGRITY = "sha512-LnvoEWDFrqGHlHmDD2101OrLcbsfkrzoSpvtSQtxK3RMnRV0eOkhhBN2dXHKRrUU8p2DGRTk35n4O8nWSVe1mQ=="
+_VIS_CSS_INTEGRITY = "sha512-WgxfT5LWjfszlPHXRmBWHkV2eceiWTOBvrKCNbdgDYTHrT2AeLCGbF4sZlZw3UMN3WtL0tGUoIAKsu8mllg/XA=="
+
+# Начало HTML документа: подключение vis-network и контейнер графа
+_HTML_HEAD = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<link rel="stylesheet" href="{_VIS_CSS_URL}" integrity="{_VIS_CSS_INTEGRITY}" crossorigin="anonymous" referrerpolicy="no-referrer" />
+<script src="{_VIS_JS_URL}" integrity="{_VIS_JS_INTEGRITY}" crossorigin="anonymous" referrerpolicy="no-referrer"></script>
+<style type="text/css">
+#mynetwork {{
+    width: 100%;
+    height: 100vh;
+    background-color: #ffffff;
+    border: 1px solid lightgray;
+    position: relative;
+    float: left;
+}}
+</style>
+</head>
+<body>
+<div id="mynetwork"></div>
+"""
+
+_HTML_TAIL = """</body>
+</html>
+"""
+
+
 class GraphVisualizer:
     def __init__(self, dependencies: Dict, output_dir: Optional[str] = None):
         """
@@ -15,13 +52,12 @@ class GraphVisualizer:
         """
         self.dependencies = dependencies
         self.output_dir = output_dir or os.getcwd()
-        self.graph = Network(
-            height="100vh",
-            width="100%",
-            bgcolor="#ffffff",
-            font_color="#000000"
-        )
-        self.graph.toggle_physics(True)
+        # Узлы и связи в формате vis-network
+        self.nodes: List[Dict] = []
+        self.edges: List[Dict] = []
+        self.options: Dict = {}
+        # Данные для подсказок к узлам файлов: путь -> {'classes': [...], 'functions': [...]}
+        self._node_data: Dict[str, Dict[str, List[str]]] = {}
         self._setup_graph_options()
 
     def _setup_graph_options(self):
@@ -32,7 +68,8 @@ class GraphVisualizer:
                 "size": 25,
                 "font": {
                     "size": 14,
-                    "face": "Tahoma"
+                    "face": "Tahoma",
+                    "color": "#000000"
                 }
             },
             "edges": {
@@ -40,6 +77,7 @@ class GraphVisualizer:
                 "smooth": {"type": "continuous"}
             },
             "physics": {
+                "enabled": True,
                 "barnesHut": {
                     "gravitationalConstant": -15000,
                     "centralGravity": 0.3,
@@ -47,6 +85,9 @@ class GraphVisualizer:
                 },
                 "minVelocity": 0.75
             },
+            "interaction": {
+                "hover": True
+            },
             "groups": {
                 "files": {
                     "color": "#97c2fc",
@@ -66,123 +107,165 @@ class GraphVisualizer:
                 }
             }
         }
-        self.graph.set_options(json.dumps(options))
+        self.options = options
 
     def create_graph(self) -> None:
         """Создает граф на основе данных о зависимостях"""
-        # Сначала создаем все узлы файлов
-        for file_path, data in self.dependencies.items():
-            self.graph.add_node(
-                file_path,
-                label=os.path.basename(file_path),
-                title=self._create_node_tooltip(file_path, data),
-                color='lightblue',
-                shape='dot',
-                size=10,
-                group='files'
-            )
+        # Граф строится заново при каждом вызове, чтобы повторный вызов не дублировал узлы
+        self.nodes = []
+        self.edges = []
+        self._node_data = {}
+
+        # Имя каждого файла вычисляется один раз и используется повторно
+        basenames = {file_path: os.path.basename(file_path) for file_path in self.dependencies}
+
+        # Индекс "имя файла -> путь" для поиска целевых файлов импортов за O(1);
+        # при совпадении имен используется первый файл, как и раньше
+        basename_index = {}
+        for dep_file, basename in basenames.items():
+            basename_index.setdefault(basename, dep_file)
+
+        # Узлы и связи собираются пачками по категориям, а не по одному
+        nodes = []
+        edges = []
+
+        # Сначала создаем все узлы файлов; подсказки к ним строятся в браузере из NODE_DATA
+        nodes.extend([
+            {
+                'id': file_path,
+                'label': basenames[file_path],
+                'color': 'lightblue',
+                'shape': 'dot',
+                'size': 10,
+                'group': 'files'
+            }
+            for file_path in self.dependencies
+        ])
+        self._node_data.update(
+            (file_path, self._create_node_data(data)) for file_path, data in self.dependencies.items()
+        )
 
         # Затем добавляем все связи и остальные узлы
         for file_path, data in self.dependencies.items():
-            # Добавляем связи по импортам
+            # Собираем связи по импортам без дубликатов: целевой файл -> импортированные элементы
+            import_edges = {}
             for imp in data.get('imports', []):
                 # Ищем соответствующий файл в зависимостях
-                target_file = None
-                for dep_file in self.dependencies.keys():
-                    if os.path.basename(dep_file) == f"{imp}.py":
-                        target_file = dep_file
-                        break
-                
+                target_file = basename_index.get(f"{imp}.py")
                 if target_file:
-                    self.graph.add_edge(file_path, target_file, color='blue', dashes=False)
+                    import_edges.setdefault(target_file, [])
 
-            # Добавляем связи по конкретным импортированным элементам
+            # Уточняем связи конкретными импортированными элементами
             for imported_name in data.get('imported_names', []):
-                module_name, item_name = imported_name.split('.')
+                # Для "import module" без точки item_name пустой - связь уже есть по imports
+                module_name, _, item_name = imported_name.partition('.')
                 # Ищем соответствующий файл
-                target_file = None
-                for dep_file in self.dependencies.keys():
-                    if os.path.basename(dep_file) == f"{module_name}.py":
-                        target_file = dep_file
-                        break
-                
+                target_file = basename_index.get(f"{module_name}.py")
                 if target_file:
-                    self.graph.add_edge(
-                        file_path, 
-                        target_file, 
-                        color='blue', 
-                        title=f"imports {item_name}",
-                        dashes=False
-                    )
+                    items = import_edges.setdefault(target_file, [])
+                    if item_name:
+                        items.append(item_name)
+
+            # Добавляем по одной связи на каждую пару файлов
+            edges.extend([
+                {'from': file_path, 'to': target_file, 'color': 'blue', 'dashes': False,
+                 **({'title': f"imports {', '.join(sorted(items))}"} if items else {})}
+                for target_file, items in import_edges.items()
+            ])
 
             # Добавляем узлы для классов и их методов
-            for class_info in data.get('classes', []):
-                class_id = f"{file_path}::{class_info['name']}"
-                self.graph.add_node(
-                    class_id,
-                    label=class_info['name'],
-                    title=f"Class: {class_info['name']}",
-                    color='orange',
-                    shape='diamond',
-                    size=8,
-                    group='classes'
-                )
-                self.graph.add_edge(file_path, class_id)
+            classes = [(f"{file_path}::{class_info['name']}", class_info)
+                       for class_info in data.get('classes', [])]
+            nodes.extend([
+                {
+                    'id': class_id,
+                    'label': class_info['name'],
+                    'title': f"Class: {class_info['name']}",
+                    'color': 'orange',
+                    'shape': 'diamond',
+                    'size': 8,
+                    'group': 'classes'
+                }
+                for class_id, class_info in classes
+            ])
+            edges.extend([{'from': file_path, 'to': class_id} for class_id, _ in classes])
 
-                # Добавляем методы класса
-                for method in class_info.get('methods', []):
-                    method_id = f"{class_id}::{method['name']}"
-                    self.graph.add_node(
-                        method_id,
-                        label=method['name'],
-                        title=f"Method: {method['name']}\nArgs: {', '.join(method.get('args', []))}",
-                        color='green',
-                        shape='triangle',
-                        size=6,
-                        group='methods'
-                    )
-                    self.graph.add_edge(class_id, method_id)
+            # Добавляем методы классов
+            methods = [(class_id, f"{class_id}::{method['name']}", method)
+                       for class_id, class_info in classes
+                       for method in class_info.get('methods', [])]
+            nodes.extend([
+                {
+                    'id': method_id,
+                    'label': method['name'],
+                    'title': f"Method: {method['name']}\nArgs: {', '.join(method.get('args', []))}",
+                    'color': 'green',
+                    'shape': 'triangle',
+                    'size': 6,
+                    'group': 'methods'
+                }
+                for _, method_id, method in methods
+            ])
+            edges.extend([{'from': class_id, 'to': method_id} for class_id, method_id, _ in methods])
 
             # Добавляем узлы для функций
-            for func_info in data.get('functions', []):
-                func_id = f"{file_path}::{func_info['name']}"
-                self.graph.add_node(
-                    func_id,
-                    label=func_info['name'],
-                    title=f"Function: {func_info['name']}\nArgs: {', '.join(func_info.get('args', []))}",
-                    color='green',
-                    shape='triangle',
-                    size=6,
-                    group='functions'
-                )
-                self.graph.add_edge(file_path, func_id)
+            functions = [(f"{file_path}::{func_info['name']}", func_info)
+                         for func_info in data.get('functions', [])]
+            nodes.extend([
+                {
+                    'id': func_id,
+                    'label': func_info['name'],
+                    'title': f"Function: {func_info['name']}\nArgs: {', '.join(func_info.get('args', []))}",
+                    'color': 'green',
+                    'shape': 'triangle',
+                    'size': 6,
+                    'group': 'functions'
+                }
+                for func_id, func_info in functions
+            ])
+            edges.extend([{'from': file_path, 'to': func_id} for func_id, _ in functions])
+
+        # Убираем дубликаты один раз в конце: vis.DataSet не допускает повторных id узлов,
+        # а связи ненаправленные, поэтому a-b и b-a считаются одной связью.
+        # Остается первый узел/связь с данным ключом (например, связь с подписью импортов)
+        unique_nodes = {}
+        for node in nodes:
+            unique_nodes.setdefault(node['id'], node)
+        unique_edges = {}
+        for edge in edges:
+            unique_edges.setdefault(self._edge_key(edge), edge)
+        self.nodes.extend(unique_nodes.values())
+        self.edges.extend(unique_edges.values())
 
-    def _create_node_tooltip(self, file_path: str, data: Dict) -> str:
+    def _edge_key(self, edge: Dict) -> Tuple[str, str]:
         """
-        Создание подсказки для узла
+        Ключ ненаправленной связи
         
         Args:
-            file_path: Путь к файлу
-            data: Данные о файле
+            edge: Связь vis-network
         
         Returns:
-            str: HTML-подсказка
+            Tuple[str, str]: Пара id узлов в упорядоченном виде
         """
-        tooltip = [f"<b>File:</b> {file_path}"]
-        
-        if data.get('classes'):
-            tooltip.append("\n<b>Classes:</b>")
-            for class_info in data['classes']:
-                tooltip.append(f"- {class_info['name']}")
+        source, to = edge['from'], edge['to']
+        return (source, to) if source <= to else (to, source)
+
+    def _create_node_data(self, data: Dict) -> Dict[str, List[str]]:
+        """
+        Подготовка данных для подсказки к узлу файла (сама подсказка строится в браузере)
         
-        if data.get('functions'):
-            tooltip.append("\n<b>Functions:</b>")
-            for func in data['functions']:
-                if func['name'].startswith('_'):
-                    continue  # Пропускаем приватные методы
-                tooltip.append(f"- {func['name']}")
+        Args:
+            data: Данные о файле
         
-        return '\n'.join(tooltip)
+        Returns:
+            Dict[str, List[str]]: Имена классов и публичных функций файла
+        """
+        return {
+            'classes': [class_info['name'] for class_info in data.get('classes', [])],
+            # Пропускаем приватные функции
+            'functions': [func['name'] for func in data.get('functions', [])
+                          if not func['name'].startswith('_')]
+        }
 
     def save(self, filename: str = "code_graph.html"):
         """
@@ -192,11 +275,6 @@ class GraphVisualizer:
             filename: Имя выходного файла
         """
         output_path = os.path.join(self.output_dir, filename)
-        self.graph.save_graph(output_path)
-        
-        # Добавляем кнопки фильтрации после сохранения
-        with open(output_path, 'r', encoding='utf-8') as f:
-            content = f.read()
         
         # Добавляем HTML для кнопок фильтрации
         filter_buttons = """
@@ -303,8 +381,77 @@ class GraphVisualizer:
         </script>
         """
         
-        # Вставляем кнопки и скрипт перед закрывающим тегом body
-        content = content.replace('</body>', f'{filter_buttons}{filter_script}</body>')
-        
+        # Данные графа сериализуются один раз и встраиваются прямо в страницу
+        graph_script = f"""
+        <script type="text/javascript">
+        var NODE_DATA = {self._to_js(self._node_data)};
+        var container = document.getElementById('mynetwork');
+        var nodes = new vis.DataSet({self._to_js(self.nodes)});
+        var edges = new vis.DataSet({self._to_js(self.edges)});
+        var options = {self._to_js(self.options)};
+        var network = new vis.Network(container, {{nodes: nodes, edges: edges}}, options);
+        </script>
+        """
+
+        # Подсказки к файлам создаются при первом наведении на узел
+        tooltip_script = """
+        <script type="text/javascript">
+        function appendTooltipLine(tooltip, label, text) {
+            var line = document.createElement('div');
+            if (label) {
+                var bold = document.createElement('b');
+                bold.textContent = label;
+                line.appendChild(bold);
+            }
+            if (text) {
+                line.appendChild(document.createTextNode(text));
+            }
+            tooltip.appendChild(line);
+        }
+
+        function createFileTooltip(fileId) {
+            var data = NODE_DATA[fileId];
+            var tooltip = document.createElement('div');
+            appendTooltipLine(tooltip, 'File:', ' ' + fileId);
+            if (data.classes.length) {
+                appendTooltipLine(tooltip, 'Classes:');
+                data.classes.forEach(name => appendTooltipLine(tooltip, null, '- ' + name));
+            }
+            if (data.functions.length) {
+                appendTooltipLine(tooltip, 'Functions:');
+                data.functions.forEach(name => appendTooltipLine(tooltip, null, '- ' + name));
+            }
+            return tooltip;
+        }
+
+        network.on('hoverNode', function (params) {
+            if (NODE_DATA.hasOwnProperty(params.node) && nodes.get(params.node).title === undefined) {
+                nodes.update({id: params.node, title: createFileTooltip(params.node)});
+            }
+        });
+        </script>
+        """
+
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+            f.write(_HTML_HEAD)
+            f.write(graph_script)
+            f.write(tooltip_script)
+            f.write(filter_buttons)
+            f.write(filter_script)
+            f.write(_HTML_TAIL)
+
+    def _to_js(self, value) -> str:
+        """
+        Сериализация данных в JSON для вставки внутрь <script>
+        
+        Args:
+            value: Данные для сериализации
+        
+        Returns:
+            str: JSON, в котором экранированы последовательности "</"
+        """
+        if orjson is not None:
+            data = orjson.dumps(value).decode('utf-8')
+        else:
+            data = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+        return data.replace('</', '<\\/')